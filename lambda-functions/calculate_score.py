@@ -20,135 +20,184 @@ IAM Permissions Required:
   - CloudWatch Logs: Write access
 """
 
+import bisect
 import json
-import boto3
+import logging
+import orjson
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
-from decimal import Decimal
 
-# Initialize AWS clients
-rds_data = boto3.client('rds-data')
+# AWS clients are created on first use so module import stays light
+_rds = None
 
 # Configuration
 DB_CLUSTER_ARN = os.environ['DB_CLUSTER_ARN']
 DB_SECRET_ARN = os.environ['DB_SECRET_ARN']
 DB_NAME = os.environ.get('DB_NAME', 'maturity_assessment')
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', '300'))
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
 
+logger = logging.getLogger()
+logger.setLevel(LOG_LEVEL if LOG_LEVEL in logging.getLevelNamesMapping() else logging.INFO)
 
-class MaturityCalculator:
+# Caches for reference data, retained across warm invocations
+_STRUCTURE_CACHE = {'topics': None, 'pillar_count': 0, 'expires': 0.0}
+
+# Maturity level boundaries: [0, 1.5) INITIAL, [1.5, 2.5) MANAGED,
+# [2.5, 3.5) DEFINED, [3.5, 5.0] OPTIMIZING
+_LEVEL_THRESHOLDS = (1.5, 2.5, 3.5)
+_LEVELS = ('INITIAL', 'MANAGED', 'DEFINED', 'OPTIMIZING')
+
+
+# Scoring helpers, mirroring the logic from /src/lib/maturity-calculator.ts
+def get_maturity_level(score: float) -> str:
+    """Map numeric score to maturity level"""
+    return _LEVELS[bisect.bisect_right(_LEVEL_THRESHOLDS, score)]
+
+
+def calculate_overall_score(pillar_scores: List[Dict[str, Any]]) -> float:
+    """Calculate overall score as weighted average of pillar scores"""
+    
+    weighted_sum = 0.0
+    total_weight = 0.0
+    for pillar in pillar_scores:
+        weight = pillar['weight']
+        weighted_sum += pillar['score'] * weight
+        total_weight += weight
+    
+    return weighted_sum / total_weight if total_weight > 0 else 0.0
+
+
+def _rds_client():
+    """Shared RDS Data API client, created on first use"""
+    global _rds
+    if _rds is None:
+        import boto3
+        _rds = boto3.client('rds-data')
+    return _rds
+
+
+def _execute(sql: str, **params: str) -> List[Dict[str, Any]]:
     """
-    Simplified version of the maturity calculation engine
-    Mirrors the logic from /src/lib/maturity-calculator.ts
+    Run a statement through the RDS Data API and return its rows as
+    dicts keyed by column alias, decoded from the JSON record format
     """
     
-    MATURITY_LEVELS = {
-        (0.0, 1.5): 'INITIAL',
-        (1.5, 2.5): 'MANAGED',
-        (2.5, 3.5): 'DEFINED',
-        (3.5, 5.0): 'OPTIMIZING'
-    }
+    response = _rds_client().execute_statement(
+        resourceArn=DB_CLUSTER_ARN,
+        secretArn=DB_SECRET_ARN,
+        database=DB_NAME,
+        sql=sql,
+        parameters=[
+            {'name': name, 'value': {'stringValue': value}}
+            for name, value in params.items()
+        ],
+        formatRecordsAs='JSON'
+    )
+    return orjson.loads(response.get('formattedRecords') or '[]')
+
+
+def _structure_is_fresh() -> bool:
+    """Whether the cached topic structure can be reused"""
+    return _STRUCTURE_CACHE['topics'] is not None and time.monotonic() < _STRUCTURE_CACHE['expires']
+
+
+def _get_topic_structure(force_refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Topic -> pillar metadata keyed by topic id, cached across warm
+    invocations so result queries don't have to re-join it every time
+    """
     
-    @staticmethod
-    def get_maturity_level(score: float) -> str:
-        """Map numeric score to maturity level"""
-        for (min_score, max_score), level in MaturityCalculator.MATURITY_LEVELS.items():
-            if min_score <= score < max_score:
-                return level
-        return 'OPTIMIZING'  # Default for 5.0
+    if not force_refresh and _structure_is_fresh():
+        return _STRUCTURE_CACHE['topics']
     
-    @staticmethod
-    def calculate_metric_score(metric_value: float, metric_level: int) -> float:
-        """
-        Calculate normalized metric score
-        metric_level represents the answer level (1-5)
-        """
-        return float(metric_level)
+    structure_query = """
+        SELECT 
+            t.id as topic_id,
+            t.name as topic_name,
+            t.weight::float8 as topic_weight,
+            p.id as pillar_id,
+            p.name as pillar_name,
+            p.weight::float8 as pillar_weight
+        FROM assessment_topics t
+        JOIN maturity_pillars p ON t.pillar_id = p.id
+    """
     
-    @staticmethod
-    def calculate_topic_score(metric_scores: List[Dict[str, Any]]) -> float:
-        """Calculate topic score as average of metric scores"""
-        if not metric_scores:
-            return 0.0
-        
-        total = sum(m['score'] for m in metric_scores)
-        return total / len(metric_scores)
+    topics = {}
+    for row in _execute(structure_query):
+        topics[row['topic_id']] = {
+            'topic_name': row['topic_name'],
+            'weight': row['topic_weight'],
+            'pillar_id': row['pillar_id'],
+            'pillar_name': row['pillar_name'],
+            'pillar_weight': row['pillar_weight']
+        }
     
-    @staticmethod
-    def calculate_pillar_score(topic_scores: List[Dict[str, Any]]) -> float:
-        """Calculate pillar score as weighted average of topic scores"""
-        if not topic_scores:
-            return 0.0
-        
-        weighted_sum = sum(t['score'] * t['weight'] for t in topic_scores)
-        total_weight = sum(t['weight'] for t in topic_scores)
-        
-        return weighted_sum / total_weight if total_weight > 0 else 0.0
+    # Dense pillar indices, ordered by name, let score rollups accumulate
+    # into flat lists instead of grouping through dicts
+    pillars = sorted({(t['pillar_name'], t['pillar_id']) for t in topics.values()})
+    pillar_index = {pillar_id: i for i, (_, pillar_id) in enumerate(pillars)}
+    for topic in topics.values():
+        topic['pillar_index'] = pillar_index[topic['pillar_id']]
     
-    @staticmethod
-    def calculate_overall_score(pillar_scores: List[Dict[str, Any]]) -> float:
-        """Calculate overall score as weighted average of pillar scores"""
-        if not pillar_scores:
-            return 0.0
-        
-        weighted_sum = sum(p['score'] * p['weight'] for p in pillar_scores)
-        total_weight = sum(p['weight'] for p in pillar_scores)
-        
-        return weighted_sum / total_weight if total_weight > 0 else 0.0
+    _STRUCTURE_CACHE['topics'] = topics
+    _STRUCTURE_CACHE['pillar_count'] = len(pillars)
+    _STRUCTURE_CACHE['expires'] = time.monotonic() + CACHE_TTL_SECONDS
+    return topics
 
 
 def get_assessment_results(session_id: str) -> List[Dict[str, Any]]:
-    """Get all assessment results for a session"""
+    """
+    Get assessment results for a session, pre-aggregated per topic.
+    Postgres averages the answered metric levels so only one row per
+    topic crosses the Data API instead of one row per answer.
+    """
     
     query = """
         SELECT 
-            ar.id,
-            ar.metric_id,
-            ar.value,
-            m.name as metric_name,
-            m.level as metric_level,
-            m.weight as metric_weight,
-            t.id as topic_id,
-            t.name as topic_name,
-            t.weight as topic_weight,
-            p.id as pillar_id,
-            p.name as pillar_name,
-            p.weight as pillar_weight
+            m.topic_id,
+            AVG(m.level)::float8 as topic_score,
+            COUNT(*) as metric_count,
+            (SELECT COUNT(*) FROM metrics WHERE active = true) as total_active
         FROM assessment_results ar
         JOIN metrics m ON ar.metric_id = m.id
-        JOIN assessment_topics t ON m.topic_id = t.id
-        JOIN maturity_pillars p ON t.pillar_id = p.id
         WHERE ar.session_id = :session_id
-        ORDER BY p.name, t.name, m.name
+        GROUP BY m.topic_id
     """
     
     try:
-        response = rds_data.execute_statement(
-            resourceArn=DB_CLUSTER_ARN,
-            secretArn=DB_SECRET_ARN,
-            database=DB_NAME,
-            sql=query,
-            parameters=[
-                {'name': 'session_id', 'value': {'stringValue': session_id}}
-            ]
-        )
+        if _structure_is_fresh():
+            rows = _execute(query, session_id=session_id)
+            structure = _get_topic_structure()
+        else:
+            # Cold cache: load the topic structure while the results query runs.
+            # The client is created up front since boto3 client creation
+            # isn't thread-safe.
+            _rds_client()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                structure_future = executor.submit(_get_topic_structure)
+                rows = _execute(query, session_id=session_id)
+                structure = structure_future.result()
+        
+        # A topic created after the cache was loaded forces one refresh
+        if any(row['topic_id'] not in structure for row in rows):
+            structure = _get_topic_structure(force_refresh=True)
         
-        results = []
-        for record in response.get('records', []):
-            results.append({
-                'id': record[0]['stringValue'],
-                'metric_id': record[1]['stringValue'],
-                'value': float(record[2]['stringValue']),
-                'metric_name': record[3]['stringValue'],
-                'metric_level': record[4]['longValue'],
-                'metric_weight': float(record[5]['stringValue']),
-                'topic_id': record[6]['stringValue'],
-                'topic_name': record[7]['stringValue'],
-                'topic_weight': float(record[8]['stringValue']),
-                'pillar_id': record[9]['stringValue'],
-                'pillar_name': record[10]['stringValue'],
-                'pillar_weight': float(record[11]['stringValue'])
-            })
+        results = [
+            {
+                'topic_id': row['topic_id'],
+                'score': row['topic_score'],
+                'metric_count': row['metric_count'],
+                'total_active': row['total_active'],
+                **structure[row['topic_id']]
+            }
+            for row in rows
+            if row['topic_id'] in structure
+        ]
         
+        results.sort(key=lambda r: (r['pillar_name'], r['topic_name']))
         return results
         
     except Exception as e:
@@ -159,7 +208,7 @@ def get_assessment_results(session_id: str) -> List[Dict[str, Any]]:
 def calculate_scores(session_id: str) -> Dict[str, Any]:
     """Calculate maturity scores for an assessment session"""
     
-    # Get all assessment results
+    # Get per-topic aggregates of the assessment results
     results = get_assessment_results(session_id)
     
     if not results:
@@ -177,94 +226,51 @@ def calculate_scores(session_id: str) -> Dict[str, Any]:
             }
         }
     
-    calculator = MaturityCalculator()
-    
-    # Group by pillar -> topic -> metric
-    pillar_data = {}
+    # One pass over the topic rows emits topic scores and accumulates
+    # each pillar's weighted sum, total weight and topic count
+    pillar_count = _STRUCTURE_CACHE['pillar_count']
+    weighted_sums = [0.0] * pillar_count
+    total_weights = [0.0] * pillar_count
+    topic_counts = [0] * pillar_count
+    pillar_rows = [None] * pillar_count
+    topic_scores = []
+    answered_metrics = 0
     
-    for result in results:
-        pillar_id = result['pillar_id']
-        topic_id = result['topic_id']
-        
-        # Initialize pillar
-        if pillar_id not in pillar_data:
-            pillar_data[pillar_id] = {
-                'id': pillar_id,
-                'name': result['pillar_name'],
-                'weight': result['pillar_weight'],
-                'topics': {}
-            }
-        
-        # Initialize topic
-        if topic_id not in pillar_data[pillar_id]['topics']:
-            pillar_data[pillar_id]['topics'][topic_id] = {
-                'id': topic_id,
-                'name': result['topic_name'],
-                'weight': result['topic_weight'],
-                'metrics': []
-            }
-        
-        # Add metric score
-        metric_score = calculator.calculate_metric_score(
-            result['value'],
-            result['metric_level']
-        )
-        
-        pillar_data[pillar_id]['topics'][topic_id]['metrics'].append({
-            'id': result['metric_id'],
-            'name': result['metric_name'],
-            'score': metric_score,
-            'weight': result['metric_weight']
+    for topic in results:
+        topic_scores.append({
+            'id': topic['topic_id'],
+            'name': topic['topic_name'],
+            'score': round(topic['score'], 2),
+            'weight': topic['weight'],
+            'metric_count': topic['metric_count']
         })
-    
-    # Calculate topic scores
-    topic_scores = []
-    for pillar in pillar_data.values():
-        for topic in pillar['topics'].values():
-            topic_score = calculator.calculate_topic_score(topic['metrics'])
-            topic_scores.append({
-                'id': topic['id'],
-                'name': topic['name'],
-                'score': round(topic_score, 2),
-                'weight': topic['weight'],
-                'metric_count': len(topic['metrics'])
-            })
-            topic['score'] = topic_score
+        
+        i = topic['pillar_index']
+        weighted_sums[i] += topic['score'] * topic['weight']
+        total_weights[i] += topic['weight']
+        topic_counts[i] += 1
+        pillar_rows[i] = topic
+        answered_metrics += topic['metric_count']
     
     # Calculate pillar scores
-    pillar_scores = []
-    for pillar in pillar_data.values():
-        topics_list = [
-            {'score': t['score'], 'weight': t['weight']} 
-            for t in pillar['topics'].values()
-        ]
-        pillar_score = calculator.calculate_pillar_score(topics_list)
-        pillar_scores.append({
-            'id': pillar['id'],
-            'name': pillar['name'],
-            'score': round(pillar_score, 2),
-            'weight': pillar['weight'],
-            'topic_count': len(pillar['topics'])
-        })
+    pillar_scores = [
+        {
+            'id': pillar_rows[i]['pillar_id'],
+            'name': pillar_rows[i]['pillar_name'],
+            'score': round(weighted_sums[i] / total_weights[i] if total_weights[i] > 0 else 0.0, 2),
+            'weight': pillar_rows[i]['pillar_weight'],
+            'topic_count': topic_counts[i]
+        }
+        for i in range(pillar_count)
+        if topic_counts[i]
+    ]
     
     # Calculate overall score
-    overall_score = calculator.calculate_overall_score(pillar_scores)
-    maturity_level = calculator.get_maturity_level(overall_score)
+    overall_score = calculate_overall_score(pillar_scores)
+    maturity_level = get_maturity_level(overall_score)
     
-    # Calculate statistics
-    total_metrics_query = """
-        SELECT COUNT(*) FROM metrics WHERE active = true
-    """
-    
-    total_metrics_response = rds_data.execute_statement(
-        resourceArn=DB_CLUSTER_ARN,
-        secretArn=DB_SECRET_ARN,
-        database=DB_NAME,
-        sql=total_metrics_query
-    )
-    
-    total_metrics = total_metrics_response['records'][0][0]['longValue']
-    answered_metrics = len(results)
+    # Calculate statistics; every row carries the same active metric count
+    total_metrics = results[0]['total_active']
     completion_percentage = (answered_metrics / total_metrics * 100) if total_metrics > 0 else 0
     
     return {
@@ -290,15 +296,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Calculates real-time maturity scores for an assessment session
     """
     
-    print(f'Received event: {json.dumps(event)}')
+    logger.debug('Received event: %s', event)
     
     try:
         # Extract session ID from parameters
-        session_id = None
-        for param in event.get('parameters', []):
-            if param['name'] == 'sessionId':
-                session_id = param['value']
-                break
+        params = {param['name']: param['value'] for param in event.get('parameters') or ()}
+        session_id = params.get('sessionId')
         
         if not session_id:
             raise ValueError('sessionId parameter is required')
@@ -316,7 +319,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'httpStatusCode': 200,
                 'responseBody': {
                     'application/json': {
-                        'body': json.dumps(calculation_result)
+                        'body': orjson.dumps(calculation_result).decode()
                     }
                 }
             },
@@ -324,7 +327,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'promptSessionAttributes': event.get('promptSessionAttributes', {})
         }
         
-        print(f'Calculated scores - Overall: {calculation_result["overall_score"]}, Level: {calculation_result["maturity_level"]}')
+        logger.debug(
+            'Calculated scores - Overall: %s, Level: %s',
+            calculation_result['overall_score'],
+            calculation_result['maturity_level']
+        )
         return response
         
     except Exception as e:
@@ -339,10 +346,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'httpStatusCode': 500,
                 'responseBody': {
                     'application/json': {
-                        'body': json.dumps({
+                        'body': orjson.dumps({
                             'error': str(e),
                             'message': 'Failed to calculate scores'
-                        })
+                        }).decode()
                     }
                 }
             }
@@ -21,145 +21,101 @@ IAM Permissions Required:
 """
 
 import json
-import boto3
+import logging
+import orjson
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 
-# Initialize AWS clients
-rds_data = boto3.client('rds-data')
+# AWS clients are created on first use so module import stays light
+_rds = None
 
 # Configuration
 DB_CLUSTER_ARN = os.environ['DB_CLUSTER_ARN']
 DB_SECRET_ARN = os.environ['DB_SECRET_ARN']
 DB_NAME = os.environ.get('DB_NAME', 'maturity_assessment')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+logger = logging.getLogger()
+logger.setLevel(LOG_LEVEL if LOG_LEVEL in logging.getLevelNamesMapping() else logging.INFO)
+
+
+def _rds_client():
+    """Shared RDS Data API client, created on first use"""
+    global _rds
+    if _rds is None:
+        import boto3
+        _rds = boto3.client('rds-data')
+    return _rds
+
+
+def _execute(sql: str, **params: str) -> List[Dict[str, Any]]:
+    """
+    Run a statement through the RDS Data API and return its rows as
+    dicts keyed by column alias, decoded from the JSON record format
+    """
+    
+    response = _rds_client().execute_statement(
+        resourceArn=DB_CLUSTER_ARN,
+        secretArn=DB_SECRET_ARN,
+        database=DB_NAME,
+        sql=sql,
+        parameters=[
+            {'name': name, 'value': {'stringValue': value}}
+            for name, value in params.items()
+        ],
+        formatRecordsAs='JSON'
+    )
+    return orjson.loads(response.get('formattedRecords') or '[]')
 
 
 def get_session_details(session_id: str) -> Dict[str, Any]:
     """Get comprehensive assessment session context"""
     
-    # Query session with target, current pillar
-    session_query = """
-        SELECT 
-            s.id,
-            s.status,
-            s.started_at,
-            s.completed_at,
-            s.last_modified,
-            s.current_pillar_id,
-            s.progress_data,
-            t.id as target_id,
-            t.name as target_name,
-            t.type as target_type,
-            t.description as target_description,
-            p.id as pillar_id,
-            p.name as pillar_name,
-            o.id as org_id,
-            o.name as org_name
-        FROM assessment_sessions s
-        JOIN assessment_targets t ON s.target_id = t.id
-        LEFT JOIN maturity_pillars p ON s.current_pillar_id = p.id
-        LEFT JOIN organizations o ON t.organization_id = o.id
-        WHERE s.id = :session_id
-    """
-    
-    try:
-        response = rds_data.execute_statement(
-            resourceArn=DB_CLUSTER_ARN,
-            secretArn=DB_SECRET_ARN,
-            database=DB_NAME,
-            sql=session_query,
-            parameters=[
-                {'name': 'session_id', 'value': {'stringValue': session_id}}
-            ]
-        )
-        
-        if not response['records']:
-            return {
-                'error': f'Assessment session not found: {session_id}',
-                'session_id': session_id
-            }
-        
-        record = response['records'][0]
-        
-        # Parse session data
-        session_data = {
-            'session': {
-                'id': session_id,
-                'status': record[1]['stringValue'],
-                'started_at': record[2]['stringValue'],
-                'completed_at': record[3].get('stringValue') if record[3].get('isNull') is False else None,
-                'last_modified': record[4]['stringValue'],
-                'current_pillar_id': record[5].get('stringValue') if record[5].get('isNull') is False else None
-            },
-            'target': {
-                'id': record[7]['stringValue'],
-                'name': record[8]['stringValue'],
-                'type': record[9]['stringValue'],
-                'description': record[10].get('stringValue', '')
-            },
-            'current_pillar': {
-                'id': record[11].get('stringValue') if record[11].get('isNull') is False else None,
-                'name': record[12].get('stringValue') if record[12].get('isNull') is False else None
-            } if record[11].get('isNull') is False else None,
-            'organization': {
-                'id': record[13].get('stringValue') if record[13].get('isNull') is False else None,
-                'name': record[14].get('stringValue') if record[14].get('isNull') is False else None
-            } if record[13].get('isNull') is False else None
-        }
-        
-        # Get progress statistics
-        progress_query = """
+    # Single round-trip: session, progress, recent activity and pillar
+    # progress are assembled by Postgres into one JSON document. Timestamps
+    # are formatted as 'YYYY-MM-DD HH:MM:SS.FFF' to match the Data API's
+    # rendering rather than json_build_object's ISO 8601 'T' form.
+    context_query = """
+        WITH session_cte AS (
+            SELECT 
+                s.id,
+                s.status,
+                to_char(s.started_at, 'YYYY-MM-DD HH24:MI:SS.MS') as started_at,
+                to_char(s.completed_at, 'YYYY-MM-DD HH24:MI:SS.MS') as completed_at,
+                to_char(s.last_modified, 'YYYY-MM-DD HH24:MI:SS.MS') as last_modified,
+                s.current_pillar_id,
+                t.id as target_id,
+                t.name as target_name,
+                t.type as target_type,
+                t.description as target_description,
+                p.id as pillar_id,
+                p.name as pillar_name,
+                o.id as org_id,
+                o.name as org_name
+            FROM assessment_sessions s
+            JOIN assessment_targets t ON s.target_id = t.id
+            LEFT JOIN maturity_pillars p ON s.current_pillar_id = p.id
+            LEFT JOIN organizations o ON t.organization_id = o.id
+            WHERE s.id = :session_id
+        ),
+        total_cte AS (
+            SELECT COUNT(*) as total_metrics FROM metrics WHERE active = true
+        ),
+        progress_cte AS (
             SELECT 
                 COUNT(*) as answered_count,
-                MIN(ar.assessed_at) as first_answer,
-                MAX(ar.assessed_at) as last_answer
+                to_char(MIN(ar.assessed_at), 'YYYY-MM-DD HH24:MI:SS.MS') as first_answer,
+                to_char(MAX(ar.assessed_at), 'YYYY-MM-DD HH24:MI:SS.MS') as last_answer
             FROM assessment_results ar
             WHERE ar.session_id = :session_id
-        """
-        
-        progress_response = rds_data.execute_statement(
-            resourceArn=DB_CLUSTER_ARN,
-            secretArn=DB_SECRET_ARN,
-            database=DB_NAME,
-            sql=progress_query,
-            parameters=[
-                {'name': 'session_id', 'value': {'stringValue': session_id}}
-            ]
-        )
-        
-        progress_record = progress_response['records'][0]
-        
-        # Get total metrics count
-        total_metrics_query = """
-            SELECT COUNT(*) FROM metrics WHERE active = true
-        """
-        
-        total_response = rds_data.execute_statement(
-            resourceArn=DB_CLUSTER_ARN,
-            secretArn=DB_SECRET_ARN,
-            database=DB_NAME,
-            sql=total_metrics_query
-        )
-        
-        total_metrics = total_response['records'][0][0]['longValue']
-        answered_count = progress_record[0]['longValue']
-        
-        session_data['progress'] = {
-            'total_metrics': total_metrics,
-            'answered_metrics': answered_count,
-            'remaining_metrics': total_metrics - answered_count,
-            'completion_percentage': round((answered_count / total_metrics * 100), 1) if total_metrics > 0 else 0,
-            'first_answer_at': progress_record[1].get('stringValue') if progress_record[1].get('isNull') is False else None,
-            'last_answer_at': progress_record[2].get('stringValue') if progress_record[2].get('isNull') is False else None
-        }
-        
-        # Get recent answers (last 5)
-        recent_answers_query = """
+        ),
+        recent_cte AS (
             SELECT 
                 ar.id,
                 ar.value,
                 ar.assessed_at,
+                to_char(ar.assessed_at, 'YYYY-MM-DD HH24:MI:SS.MS') as assessed_at_text,
                 m.name as metric_name,
                 t.name as topic_name,
                 p.name as pillar_name
@@ -170,72 +126,100 @@ def get_session_details(session_id: str) -> Dict[str, Any]:
             WHERE ar.session_id = :session_id
             ORDER BY ar.assessed_at DESC
             LIMIT 5
-        """
-        
-        recent_response = rds_data.execute_statement(
-            resourceArn=DB_CLUSTER_ARN,
-            secretArn=DB_SECRET_ARN,
-            database=DB_NAME,
-            sql=recent_answers_query,
-            parameters=[
-                {'name': 'session_id', 'value': {'stringValue': session_id}}
-            ]
-        )
-        
-        recent_answers = []
-        for rec in recent_response.get('records', []):
-            recent_answers.append({
-                'id': rec[0]['stringValue'],
-                'value': float(rec[1]['stringValue']),
-                'assessed_at': rec[2]['stringValue'],
-                'metric_name': rec[3]['stringValue'],
-                'topic_name': rec[4]['stringValue'],
-                'pillar_name': rec[5]['stringValue']
-            })
-        
-        session_data['recent_activity'] = recent_answers
-        
-        # Get pillar progress breakdown
-        pillar_progress_query = """
+        ),
+        pillar_cte AS (
             SELECT 
                 p.id,
                 p.name,
-                COUNT(DISTINCT ar.id) as answered,
-                COUNT(DISTINCT m.id) as total
+                (
+                    SELECT COUNT(*)
+                    FROM assessment_results ar
+                    JOIN metrics m ON ar.metric_id = m.id
+                    JOIN assessment_topics t ON m.topic_id = t.id
+                    WHERE t.pillar_id = p.id
+                      AND m.active = true
+                      AND ar.session_id = :session_id
+                ) as answered,
+                (
+                    SELECT COUNT(*)
+                    FROM metrics m
+                    JOIN assessment_topics t ON m.topic_id = t.id
+                    WHERE t.pillar_id = p.id
+                      AND m.active = true
+                ) as total
             FROM maturity_pillars p
-            LEFT JOIN assessment_topics t ON p.id = t.pillar_id
-            LEFT JOIN metrics m ON t.id = m.topic_id AND m.active = true
-            LEFT JOIN assessment_results ar ON m.id = ar.metric_id AND ar.session_id = :session_id
             WHERE p.is_active = true
-            GROUP BY p.id, p.name
-            ORDER BY p.name
-        """
-        
-        pillar_progress_response = rds_data.execute_statement(
-            resourceArn=DB_CLUSTER_ARN,
-            secretArn=DB_SECRET_ARN,
-            database=DB_NAME,
-            sql=pillar_progress_query,
-            parameters=[
-                {'name': 'session_id', 'value': {'stringValue': session_id}}
-            ]
         )
+        SELECT json_build_object(
+            'session', json_build_object(
+                'id', s.id,
+                'status', s.status,
+                'started_at', s.started_at,
+                'completed_at', s.completed_at,
+                'last_modified', s.last_modified,
+                'current_pillar_id', s.current_pillar_id
+            ),
+            'target', json_build_object(
+                'id', s.target_id,
+                'name', s.target_name,
+                'type', s.target_type,
+                'description', COALESCE(s.target_description, '')
+            ),
+            'current_pillar', CASE WHEN s.pillar_id IS NULL THEN NULL ELSE json_build_object(
+                'id', s.pillar_id,
+                'name', s.pillar_name
+            ) END,
+            'organization', CASE WHEN s.org_id IS NULL THEN NULL ELSE json_build_object(
+                'id', s.org_id,
+                'name', s.org_name
+            ) END,
+            'progress', json_build_object(
+                'total_metrics', tc.total_metrics,
+                'answered_metrics', pc.answered_count,
+                'remaining_metrics', tc.total_metrics - pc.answered_count,
+                'completion_percentage', CASE WHEN tc.total_metrics > 0
+                    THEN ROUND(pc.answered_count * 100.0 / tc.total_metrics, 1) ELSE 0 END,
+                'first_answer_at', pc.first_answer,
+                'last_answer_at', pc.last_answer
+            ),
+            'recent_activity', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', r.id,
+                    'value', r.value,
+                    'assessed_at', r.assessed_at_text,
+                    'metric_name', r.metric_name,
+                    'topic_name', r.topic_name,
+                    'pillar_name', r.pillar_name
+                ) ORDER BY r.assessed_at DESC)
+                FROM recent_cte r
+            ), '[]'::json),
+            'pillar_progress', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'pillar_id', pp.id,
+                    'pillar_name', pp.name,
+                    'answered', pp.answered,
+                    'total', pp.total,
+                    'completion_percentage', CASE WHEN pp.total > 0
+                        THEN ROUND(pp.answered * 100.0 / pp.total, 1) ELSE 0 END
+                ) ORDER BY pp.name)
+                FROM pillar_cte pp
+            ), '[]'::json)
+        )::text as context
+        FROM session_cte s
+        CROSS JOIN total_cte tc
+        CROSS JOIN progress_cte pc
+    """
+    
+    try:
+        rows = _execute(context_query, session_id=session_id)
         
-        pillar_progress = []
-        for rec in pillar_progress_response.get('records', []):
-            total = rec[3]['longValue']
-            answered = rec[2]['longValue']
-            pillar_progress.append({
-                'pillar_id': rec[0]['stringValue'],
-                'pillar_name': rec[1]['stringValue'],
-                'answered': answered,
-                'total': total,
-                'completion_percentage': round((answered / total * 100), 1) if total > 0 else 0
-            })
-        
-        session_data['pillar_progress'] = pillar_progress
+        if not rows:
+            return {
+                'error': f'Assessment session not found: {session_id}',
+                'session_id': session_id
+            }
         
-        return session_data
+        return orjson.loads(rows[0]['context'])
         
     except Exception as e:
         print(f'Error getting session details: {str(e)}')
@@ -254,15 +238,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Returns comprehensive assessment session context for AI recommendations
     """
     
-    print(f'Received event: {json.dumps(event)}')
+    logger.debug('Received event: %s', event)
     
     try:
         # Extract session ID from parameters
-        session_id = None
-        for param in event.get('parameters', []):
-            if param['name'] == 'sessionId':
-                session_id = param['value']
-                break
+        params = {param['name']: param['value'] for param in event.get('parameters') or ()}
+        session_id = params.get('sessionId')
         
         if not session_id:
             raise ValueError('sessionId parameter is required')
@@ -280,7 +261,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'httpStatusCode': 200 if 'error' not in session_context else 404,
                 'responseBody': {
                     'application/json': {
-                        'body': json.dumps(session_context)
+                        'body': orjson.dumps(session_context).decode()
                     }
                 }
             },
@@ -288,9 +269,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'promptSessionAttributes': event.get('promptSessionAttributes', {})
         }
         
-        print(f'Returning context for session: {session_id}')
+        logger.debug('Returning context for session: %s', session_id)
         if 'progress' in session_context:
-            print(f'Progress: {session_context["progress"]["completion_percentage"]}% complete')
+            logger.debug('Progress: %s%% complete', session_context['progress']['completion_percentage'])
         
         return response
         
@@ -306,10 +287,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'httpStatusCode': 500,
                 'responseBody': {
                     'application/json': {
-                        'body': json.dumps({
+                        'body': orjson.dumps({
                             'error': str(e),
                             'message': 'Failed to get assessment context'
-                        })
+                        }).decode()
                     }
                 }
             }
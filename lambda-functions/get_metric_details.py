@@ -18,21 +18,377 @@ IAM Permissions Required:
 """
 
 import json
+import logging
 import boto3
+import orjson
 import os
-from typing import Dict, Any, List
+import threading
+import time
+import uuid
+from botocore.config import Config
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+# Initialize AWS client with keepalive, short timeouts and bounded retries
+_CLIENT_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 3},
+    read_timeout=5,
+    connect_timeout=2,
+    max_pool_connections=50
+)
+rds_data = boto3.client('rds-data', config=_CLIENT_CONFIG)
+
+
+def _require_arn(name: str, service: str) -> str:
+    """
+    ARN from an environment variable, raising at import so a misconfigured
+    deploy fails on cold start instead of inside every invocation
+    """
+    
+    value = os.environ.get(name, '')
+    parts = value.split(':', 5)
+    if len(parts) < 6 or parts[0] != 'arn' or parts[2] != service:
+        raise RuntimeError(f'{name} must be a {service} ARN, got {value!r}')
+    return value
 
-# Initialize AWS clients
-rds_data = boto3.client('rds-data')
-secrets_client = boto3.client('secretsmanager')
 
 # Configuration from environment variables
-DB_CLUSTER_ARN = os.environ['DB_CLUSTER_ARN']
-DB_SECRET_ARN = os.environ['DB_SECRET_ARN']
+DB_CLUSTER_ARN = _require_arn('DB_CLUSTER_ARN', 'rds')
+DB_SECRET_ARN = _require_arn('DB_SECRET_ARN', 'secretsmanager')
 DB_NAME = os.environ.get('DB_NAME', 'maturity_assessment')
+METRIC_CACHE_TTL = float(os.environ.get('METRIC_CACHE_TTL', '300'))
+METRIC_CACHE_MAX_ENTRIES = 512
+NEGATIVE_CACHE_TTL = 60.0
+NEGATIVE_CACHE_MAX_ENTRIES = 1024
+MAX_BATCH_METRIC_IDS = 50
+PRE_WARM = os.environ.get('PRE_WARM', '1') == '1'
+WARMUP_TIMEOUT_SECONDS = 3.0
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+# Guidance text that doesn't depend on the metric
+_BEST_PRACTICES_SOURCE = 'YAML configuration in Knowledge Base'
+
+# Metric with its topic, pillar and guidance text, by single id or comma-separated ids
+_METRIC_SELECT = """
+    SELECT 
+        m.id,
+        m.name as metric_name,
+        COALESCE(m.description, '') as metric_description,
+        m.level,
+        m.metric_type,
+        m.min_value::float8 as min_value,
+        m.max_value::float8 as max_value,
+        m.weight::float8 as weight,
+        COALESCE(to_json(m.tags), '[]'::json)::text as tags,
+        t.id as topic_id,
+        t.name as topic_name,
+        COALESCE(t.description, '') as topic_description,
+        p.id as pillar_id,
+        p.name as pillar_name,
+        COALESCE(p.description, '') as pillar_description,
+        p.category,
+        'Check Knowledge Base for ' || m.name || ' criteria' as criteria_available,
+        'Focus on Level ' || m.level::text || ' requirements' as recommendation
+    FROM metrics m
+    JOIN assessment_topics t ON m.topic_id = t.id
+    JOIN maturity_pillars p ON t.pillar_id = p.id
+"""
+_METRIC_QUERY = _METRIC_SELECT + """
+    WHERE m.id = :metric_id AND m.active = true
+"""
+_METRIC_BATCH_QUERY = _METRIC_SELECT + """
+    WHERE m.id = ANY(string_to_array(:metric_ids, ',')) AND m.active = true
+"""
+
+logger = logging.getLogger()
+logger.setLevel(LOG_LEVEL if LOG_LEVEL in logging.getLevelNamesMapping() else logging.INFO)
+
+
+# Response structure. Field names are the JSON keys; orjson serializes
+# these natively. Instances are frozen so cached entries can be shared.
+@dataclass(slots=True, frozen=True)
+class MetricCore:
+    id: str
+    name: str
+    description: str
+    level: int
+    type: str
+    minValue: Optional[float]
+    maxValue: Optional[float]
+    weight: Optional[float]
+    tags: Tuple[str, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class Topic:
+    id: str
+    name: str
+    description: str
+
+
+@dataclass(slots=True, frozen=True)
+class Pillar:
+    id: str
+    name: str
+    description: str
+    category: str
+
+
+@dataclass(slots=True, frozen=True)
+class Guidance:
+    criteria_available: str
+    best_practices_source: str
+    recommendation: str
+
+
+@dataclass(slots=True, frozen=True)
+class MetricData:
+    metric: MetricCore
+    topic: Topic
+    pillar: Pillar
+    guidance: Guidance
+
+
+# metric_id -> (cached_at, metric_data), LRU-ordered and retained across
+# warm invocations
+_METRIC_CACHE: 'OrderedDict[str, Tuple[float, MetricData]]' = OrderedDict()
+
+# metric_id -> cached_at for ids that recently came back not found
+_NEG_CACHE: 'OrderedDict[str, float]' = OrderedDict()
+
+
+def _execute(sql: str, **params: str) -> List[Dict[str, Any]]:
+    """
+    Run a statement through the RDS Data API and return its rows as
+    dicts keyed by column alias, decoded from the JSON record format
+    """
+    
+    response = rds_data.execute_statement(
+        resourceArn=DB_CLUSTER_ARN,
+        secretArn=DB_SECRET_ARN,
+        database=DB_NAME,
+        sql=sql,
+        parameters=[
+            {'name': name, 'value': {'stringValue': value}}
+            for name, value in params.items()
+        ],
+        formatRecordsAs='JSON'
+    )
+    return orjson.loads(response.get('formattedRecords') or '[]')
+
+
+def _warmup_query() -> None:
+    """Trivial statement that opens the pooled Data API connection"""
+    
+    try:
+        _execute('SELECT 1')
+    except Exception:
+        logger.warning('Warm-up query failed', exc_info=True)
+
+
+def _warmup() -> None:
+    """
+    Issue a trivial statement during the Lambda INIT phase so endpoint
+    resolution, credential loading and the TLS handshake are done before
+    the first invocation. The wait is capped at WARMUP_TIMEOUT_SECONDS so a
+    stalled Data API (timeouts plus retries) can't push INIT past its 10 s
+    limit; a slow query keeps running in the background.
+    """
+    
+    thread = threading.Thread(target=_warmup_query, daemon=True)
+    thread.start()
+    thread.join(WARMUP_TIMEOUT_SECONDS)
+    if thread.is_alive():
+        logger.warning('Warm-up query still running after %.1fs, continuing INIT', WARMUP_TIMEOUT_SECONDS)
+
+
+if PRE_WARM:
+    _warmup()
+
+
+def _cache_get(metric_id: str, now: float) -> Optional[MetricData]:
+    """Fresh cached metric, or None on a miss"""
+    
+    cached = _METRIC_CACHE.get(metric_id)
+    if cached is None:
+        return None
+    
+    cached_at, cached_data = cached
+    if now - cached_at >= METRIC_CACHE_TTL:
+        del _METRIC_CACHE[metric_id]
+        return None
+    
+    _METRIC_CACHE.move_to_end(metric_id)
+    return cached_data
+
+
+def _cache_put(metric_id: str, metric_data: MetricData, now: float) -> None:
+    """Store a metric, evicting the least recently used entry when full"""
+    
+    _METRIC_CACHE[metric_id] = (now, metric_data)
+    if len(_METRIC_CACHE) > METRIC_CACHE_MAX_ENTRIES:
+        _METRIC_CACHE.popitem(last=False)
+
+
+def _neg_cache_hit(metric_id: str, now: float) -> bool:
+    """True if the metric was not found within the last NEGATIVE_CACHE_TTL seconds"""
+    
+    cached_at = _NEG_CACHE.get(metric_id)
+    if cached_at is None:
+        return False
+    
+    if now - cached_at >= NEGATIVE_CACHE_TTL:
+        del _NEG_CACHE[metric_id]
+        return False
+    
+    return True
+
+
+def _neg_cache_put(metric_id: str, now: float) -> None:
+    """Remember a missing metric, evicting the oldest entry when full"""
+    
+    _NEG_CACHE[metric_id] = now
+    _NEG_CACHE.move_to_end(metric_id)
+    if len(_NEG_CACHE) > NEGATIVE_CACHE_MAX_ENTRIES:
+        _NEG_CACHE.popitem(last=False)
+
+
+def _not_found(metric_id: str) -> Dict[str, Any]:
+    """Error body for a metric that doesn't exist or isn't active"""
+    
+    return {
+        'error': f'Metric not found: {metric_id}',
+        'metric_id': metric_id
+    }
 
 
 def get_metric_details(metric_id: str) -> Dict[str, Any]:
+    """
+    Get metric details as {'status': ..., 'body': ...}, served from the
+    warm-container cache while the entry is younger than METRIC_CACHE_TTL
+    seconds. Status is 200, 404 when the metric is missing, or 500 when
+    the query fails.
+    """
+    
+    now = time.monotonic()
+    cached = _cache_get(metric_id, now)
+    if cached is not None:
+        return {'status': 200, 'body': cached}
+    if _neg_cache_hit(metric_id, now):
+        return {'status': 404, 'body': _not_found(metric_id)}
+    
+    result = _query_metric_details(metric_id)
+    # Query failures are not cached so transient errors aren't pinned
+    if result['status'] == 200:
+        _cache_put(metric_id, result['body'], now)
+    elif result['status'] == 404:
+        _neg_cache_put(metric_id, now)
+    return result
+
+
+def get_metric_details_batch(metric_ids: List[str]) -> Dict[str, Any]:
+    """
+    Get details for several metrics as {'status': ..., 'body': {'metrics': ...}}
+    with metrics keyed by metric id. Cache misses are fetched together in a
+    single query. Status is 200 if any metric was found, 500 if the query
+    failed, otherwise 404.
+    """
+    
+    now = time.monotonic()
+    results = {}
+    missing = []
+    found = False
+    for metric_id in metric_ids:
+        cached = _cache_get(metric_id, now)
+        if cached is not None:
+            results[metric_id] = cached
+            found = True
+        elif _neg_cache_hit(metric_id, now):
+            results[metric_id] = _not_found(metric_id)
+        else:
+            missing.append(metric_id)
+    
+    query_error = None
+    if missing:
+        fetched = {}
+        try:
+            for row in _execute(_METRIC_BATCH_QUERY, metric_ids=','.join(missing)):
+                metric_data = _parse_metric_row(row)
+                fetched[metric_data.metric.id] = metric_data
+        except Exception as e:
+            logger.exception('Error querying metrics')
+            query_error = str(e)
+        
+        for metric_id in missing:
+            metric_data = fetched.get(metric_id)
+            if query_error is not None:
+                metric_data = {
+                    'error': query_error,
+                    'metric_id': metric_id
+                }
+            elif metric_data is None:
+                metric_data = _not_found(metric_id)
+                _neg_cache_put(metric_id, now)
+            else:
+                _cache_put(metric_id, metric_data, now)
+                found = True
+            results[metric_id] = metric_data
+    
+    if found:
+        status = 200
+    else:
+        status = 500 if query_error is not None else 404
+    
+    return {
+        'status': status,
+        'body': {'metrics': {metric_id: results[metric_id] for metric_id in metric_ids}}
+    }
+
+
+def _parse_metric_row(row: Dict[str, Any]) -> MetricData:
+    """Convert one metric row into the response structure"""
+    
+    # TODO: In production, also load YAML metadata for:
+    # - Detailed criteria for each level (1-5)
+    # - Best practices
+    # - Examples
+    # - Implementation guidance
+    
+    # For now, guidance text is templated by the query
+    return MetricData(
+        metric=MetricCore(
+            id=row['id'],
+            name=row['metric_name'],
+            description=row['metric_description'],
+            level=row['level'],
+            type=row['metric_type'],
+            minValue=row['min_value'],
+            maxValue=row['max_value'],
+            weight=row['weight'],
+            tags=tuple(orjson.loads(row['tags']))
+        ),
+        topic=Topic(
+            id=row['topic_id'],
+            name=row['topic_name'],
+            description=row['topic_description']
+        ),
+        pillar=Pillar(
+            id=row['pillar_id'],
+            name=row['pillar_name'],
+            description=row['pillar_description'],
+            category=row['category']
+        ),
+        guidance=Guidance(
+            criteria_available=row['criteria_available'],
+            best_practices_source=_BEST_PRACTICES_SOURCE,
+            recommendation=row['recommendation']
+        )
+    )
+
+
+def _query_metric_details(metric_id: str) -> Dict[str, Any]:
     """
     Query database for metric details including:
     - Basic info (name, description, level)
@@ -42,99 +398,74 @@ def get_metric_details(metric_id: str) -> Dict[str, Any]:
     - Examples
     """
     
-    # Query metric with topic and pillar
-    metric_query = """
-        SELECT 
-            m.id,
-            m.name as metric_name,
-            m.description as metric_description,
-            m.level,
-            m.metric_type,
-            m.min_value,
-            m.max_value,
-            m.weight,
-            m.tags,
-            t.id as topic_id,
-            t.name as topic_name,
-            t.description as topic_description,
-            p.id as pillar_id,
-            p.name as pillar_name,
-            p.description as pillar_description,
-            p.category
-        FROM metrics m
-        JOIN assessment_topics t ON m.topic_id = t.id
-        JOIN maturity_pillars p ON t.pillar_id = p.id
-        WHERE m.id = :metric_id AND m.active = true
-    """
-    
     try:
-        response = rds_data.execute_statement(
-            resourceArn=DB_CLUSTER_ARN,
-            secretArn=DB_SECRET_ARN,
-            database=DB_NAME,
-            sql=metric_query,
-            parameters=[
-                {'name': 'metric_id', 'value': {'stringValue': metric_id}}
-            ]
-        )
-        
-        if not response['records']:
-            return {
-                'error': f'Metric not found: {metric_id}',
-                'metric_id': metric_id
-            }
-        
-        record = response['records'][0]
-        
-        # Parse the result
-        metric_data = {
-            'metric': {
-                'id': metric_id,
-                'name': record[1]['stringValue'],
-                'description': record[2].get('stringValue', ''),
-                'level': record[3]['longValue'],
-                'type': record[4]['stringValue'],
-                'minValue': float(record[5]['stringValue']),
-                'maxValue': float(record[6]['stringValue']),
-                'weight': float(record[7]['stringValue']),
-                'tags': json.loads(record[8].get('stringValue', '[]'))
-            },
-            'topic': {
-                'id': record[9]['stringValue'],
-                'name': record[10]['stringValue'],
-                'description': record[11].get('stringValue', '')
-            },
-            'pillar': {
-                'id': record[12]['stringValue'],
-                'name': record[13]['stringValue'],
-                'description': record[14].get('stringValue', ''),
-                'category': record[15]['stringValue']
-            }
-        }
+        rows = _execute(_METRIC_QUERY, metric_id=metric_id)
         
-        # TODO: In production, also load YAML metadata for:
-        # - Detailed criteria for each level (1-5)
-        # - Best practices
-        # - Examples
-        # - Implementation guidance
-        
-        # For now, provide guidance structure
-        metric_data['guidance'] = {
-            'criteria_available': f'Check Knowledge Base for {metric_data["metric"]["name"]} criteria',
-            'best_practices_source': 'YAML configuration in Knowledge Base',
-            'recommendation': f'Focus on Level {metric_data["metric"]["level"]} requirements'
-        }
+        if not rows:
+            return {'status': 404, 'body': _not_found(metric_id)}
         
-        return metric_data
+        return {'status': 200, 'body': _parse_metric_row(rows[0])}
         
     except Exception as e:
-        print(f'Error querying metric: {str(e)}')
+        logger.exception('Error querying metric')
         return {
-            'error': str(e),
-            'metric_id': metric_id
+            'status': 500,
+            'body': {
+                'error': str(e),
+                'metric_id': metric_id
+            }
         }
 
 
+def _parse_metric_ids(value: Any) -> List[str]:
+    """
+    Metric ids from a JSON array or comma-separated string, de-duplicated in
+    order. Raises ValueError if the value is neither.
+    """
+    
+    if isinstance(value, str):
+        # orjson.JSONDecodeError is a ValueError
+        value = orjson.loads(value) if value.lstrip().startswith('[') else value.split(',')
+    if not isinstance(value, list):
+        raise ValueError('metricIds must be a JSON array or comma-separated string')
+    
+    return list(dict.fromkeys(str(metric_id).strip() for metric_id in value if str(metric_id).strip()))
+
+
+def _canonical_uuid(value: Any) -> Optional[str]:
+    """
+    UUID in the lowercase hyphenated form metric ids are stored in, or None
+    if the value isn't a UUID. Uppercase, braced, urn:uuid: and unhyphenated
+    spellings are normalized so they match the stored id.
+    """
+    
+    try:
+        return str(uuid.UUID(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _build_response(event: Dict[str, Any], status_code: int, body: Any) -> Dict[str, Any]:
+    """Wrap a JSON body in the Bedrock Agent action group response format"""
+    
+    return {
+        'messageVersion': '1.0',
+        'response': {
+            'actionGroup': event.get('actionGroup', ''),
+            'apiPath': event.get('apiPath', ''),
+            'httpMethod': event.get('httpMethod', ''),
+            'httpStatusCode': status_code,
+            'responseBody': {
+                'application/json': {
+                    'body': orjson.dumps(body).decode()
+                }
+            }
+        },
+        'sessionAttributes': event.get('sessionAttributes', {}),
+        'promptSessionAttributes': event.get('promptSessionAttributes', {})
+    }
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Lambda handler for Bedrock Agent action group
@@ -159,64 +490,58 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     }
     """
     
-    print(f'Received event: {json.dumps(event)}')
+    logger.debug('Received event: %s', event)
     
     try:
-        # Extract metric ID from parameters
-        metric_id = None
-        for param in event.get('parameters', []):
-            if param['name'] == 'metricId':
-                metric_id = param['value']
-                break
-        
-        if not metric_id:
-            raise ValueError('metricId parameter is required')
-        
-        # Get metric details
-        metric_data = get_metric_details(metric_id)
+        # Extract metric ID(s) from parameters
+        params = {param['name']: param['value'] for param in event.get('parameters') or ()}
+        if 'metricIds' in params:
+            try:
+                metric_ids = _parse_metric_ids(params['metricIds'])
+            except ValueError:
+                return _build_response(event, 400, {'error': 'invalid metricIds', 'metric_ids': params['metricIds']})
+            if not metric_ids:
+                return _build_response(event, 400, {'error': 'metricIds must not be empty'})
+            
+            # Keep the batch query well under the Data API response size limit
+            if len(metric_ids) > MAX_BATCH_METRIC_IDS:
+                return _build_response(event, 400, {
+                    'error': f'at most {MAX_BATCH_METRIC_IDS} metricIds per request',
+                    'count': len(metric_ids)
+                })
+            
+            # Reject malformed ids before they cost a database round-trip
+            canonical_ids = [_canonical_uuid(value) for value in metric_ids]
+            invalid = [value for value, canonical in zip(metric_ids, canonical_ids) if canonical is None]
+            if invalid:
+                return _build_response(event, 400, {'error': 'invalid metricIds', 'metric_ids': invalid})
+            
+            # Get details for all requested metrics in one round-trip
+            result = get_metric_details_batch(list(dict.fromkeys(canonical_ids)))
+        else:
+            if not params.get('metricId'):
+                return _build_response(event, 400, {'error': 'metricId or metricIds parameter is required'})
+            metric_id = _canonical_uuid(params['metricId'])
+            if metric_id is None:
+                return _build_response(event, 400, {'error': 'invalid metricId', 'metric_id': params['metricId']})
+            
+            # Get metric details
+            result = get_metric_details(metric_id)
         
         # Format response for Bedrock Agent
-        response = {
-            'messageVersion': '1.0',
-            'response': {
-                'actionGroup': event['actionGroup'],
-                'apiPath': event['apiPath'],
-                'httpMethod': event['httpMethod'],
-                'httpStatusCode': 200 if 'error' not in metric_data else 404,
-                'responseBody': {
-                    'application/json': {
-                        'body': json.dumps(metric_data)
-                    }
-                }
-            },
-            'sessionAttributes': event.get('sessionAttributes', {}),
-            'promptSessionAttributes': event.get('promptSessionAttributes', {})
-        }
+        response = _build_response(event, result['status'], result['body'])
         
-        print(f'Returning response: {json.dumps(response)}')
+        logger.debug('Returning response: %s', response)
         return response
         
     except Exception as e:
-        print(f'Error in lambda_handler: {str(e)}')
+        logger.exception('Error in lambda_handler')
         
         # Return error response
-        return {
-            'messageVersion': '1.0',
-            'response': {
-                'actionGroup': event.get('actionGroup', ''),
-                'apiPath': event.get('apiPath', ''),
-                'httpMethod': event.get('httpMethod', ''),
-                'httpStatusCode': 500,
-                'responseBody': {
-                    'application/json': {
-                        'body': json.dumps({
-                            'error': str(e),
-                            'message': 'Failed to get metric details'
-                        })
-                    }
-                }
-            }
-        }
+        return _build_response(event, 500, {
+            'error': str(e),
+            'message': 'Failed to get metric details'
+        })
 
 
 # For local testing
@@ -230,7 +555,7 @@ if __name__ == '__main__':
             {
                 'name': 'metricId',
                 'type': 'string',
-                'value': 'test-metric-id-123'
+                'value': '00000000-0000-0000-0000-000000000000'
             }
         ],
         'sessionId': 'test-session',
@@ -180,9 +180,15 @@ echo "==================================================================="
 
 cd lambda-functions
 
+# Vendor third-party dependencies (orjson) built for the Lambda runtime
+echo "Installing Lambda dependencies..."
+rm -rf build get_metric_details.zip calculate_score.zip get_assessment_context.zip
+pip install -q -r requirements.txt --target build/ \
+  --platform manylinux2014_x86_64 --python-version 3.11 --only-binary=:all:
+
 # Lambda 1: Get Metric Details
 echo "Deploying get_metric_details..."
-zip -q get_metric_details.zip get_metric_details.py
+(cd build && zip -qr ../get_metric_details.zip .) && zip -q get_metric_details.zip get_metric_details.py
 
 FUNCTION_NAME="${PREFIX}-get-metric-details"
 
@@ -211,7 +217,7 @@ fi
 
 # Lambda 2: Calculate Score
 echo "Deploying calculate_score..."
-zip -q calculate_score.zip calculate_score.py
+(cd build && zip -qr ../calculate_score.zip .) && zip -q calculate_score.zip calculate_score.py
 
 FUNCTION_NAME="${PREFIX}-calculate-score"
 
@@ -240,7 +246,7 @@ fi
 
 # Lambda 3: Get Assessment Context
 echo "Deploying get_assessment_context..."
-zip -q get_assessment_context.zip get_assessment_context.py
+(cd build && zip -qr ../get_assessment_context.zip .) && zip -q get_assessment_context.zip get_assessment_context.py
 
 FUNCTION_NAME="${PREFIX}-get-assessment-context"
 